@@ -1,22 +1,92 @@
-from flask import Flask, jsonify, request, session, redirect, url_for
+from flask import Flask, Response, jsonify, request, session, redirect, url_for
+from flask.json.provider import JSONProvider
+import gzip
+import hashlib
+import logging
+import orjson
 import os
+import re
 import sys
-from datetime import datetime
+import threading
+from collections import OrderedDict
 from functools import wraps
+from typing import Any, NamedTuple
+
+from json_responses import json_template, now_iso, timestamped_response
+
+# Brotli is optional; pages are still served gzip-compressed without it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that serializes with orjson instead of the stdlib json module"""
+    
+    def _encode(self, obj, default=None, sort_keys=False, indent=None, separators=None, **kwargs):
+        """Serialize to bytes, mapping the json.dumps options orjson supports"""
+        if kwargs:
+            raise TypeError(f"Unsupported JSON options: {', '.join(sorted(kwargs))}")
+        # orjson output is always compact, which is what the session
+        # serializer asks for
+        if separators is not None and tuple(separators) != (',', ':'):
+            raise TypeError('orjson only supports compact separators')
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent is not None:
+            if indent != 2:
+                raise TypeError('orjson only supports indent=2')
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, **kwargs).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            raise TypeError(f"Unsupported JSON options: {', '.join(sorted(kwargs))}")
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Build the body straight from orjson's bytes instead of going
+        # through dumps() and re-encoding the str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype='application/json')
+
+# Initialization messages go to the root logger so gunicorn's or the
+# platform's logging config applies; standalone, fall back to stderr
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+if not logging.getLogger().handlers:
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
 
 # Create Flask app first
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.secret_key = os.environ.get('SECRET_KEY', 'fallback-secret-key-for-development')
 
-# Global variables for components
-file_manager = None
-knowledge_base = None
-user_manager = None
-ai_assistant = None
+# Environment values reported by /health, read once at startup
+_ENV_SNAPSHOT = {
+    'flask_env': os.environ.get('FLASK_ENV', 'not_set'),
+    'has_gemini_key': bool(os.environ.get('GEMINI_API_KEY')),
+    'vercel_env': os.environ.get('VERCEL_ENV', 'not_vercel')
+}
 
-def safe_import_and_init():
+class Components(NamedTuple):
+    """Initialized components; replaced as a whole, never mutated in place"""
+    file_manager: Any = None
+    knowledge_base: Any = None
+    user_manager: Any = None
+    ai_assistant: Any = None
+
+# Current components, published once initialization finishes
+_components = Components()
+
+def _import_and_init():
     """Safely import and initialize components with error handling"""
-    global file_manager, knowledge_base, user_manager, ai_assistant
+    global _components
+    file_manager = knowledge_base = ai_assistant = None
     
     try:
         # Try to import our modules one by one
@@ -29,43 +99,67 @@ def safe_import_and_init():
         
         # Initialize file manager first
         file_manager = FileManager()
-        print("✅ File manager initialized")
+        logger.info("✅ File manager initialized")
         
         # Initialize knowledge base
         knowledge_base = EnhancedKnowledgeBase(file_manager)
-        print("✅ Knowledge base initialized")
+        logger.info("✅ Knowledge base initialized")
         
         # Try to initialize AI assistant with API key
         try:
             api_key = os.environ.get('GEMINI_API_KEY')
             if api_key:
                 ai_assistant = EnhancedAIAssistant(knowledge_base, api_key)
-                print("✅ AI assistant initialized")
+                logger.info("✅ AI assistant initialized")
             else:
-                print("⚠️ GEMINI_API_KEY not found")
+                logger.warning("⚠️ GEMINI_API_KEY not found")
                 ai_assistant = None
         except Exception as e:
-            print(f"⚠️ AI assistant failed: {e}")
+            logger.warning(f"⚠️ AI assistant failed: {e}")
             ai_assistant = None
             
-        print("✅ Core components initialization completed")
+        logger.info("✅ Core components initialization completed")
         return True
         
     except Exception as e:
-        print(f"❌ Critical error in initialization: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Critical error in initialization: {e}")
         return False
+    
+    finally:
+        # Publish whatever was built, even after a partial failure
+        _components = Components(file_manager, knowledge_base, None, ai_assistant)
 
-# Initialize components
-components_ready = safe_import_and_init()
+_NOT_FOUND_BODY = orjson.dumps({
+    'error': 'Not Found',
+    'message': 'The requested resource was not found',
+    'available_endpoints': ['/', '/health', '/demo', '/demo-ask', '/simple-login', '/test-components'],
+    'status_code': 404
+})
 
-@app.route('/')
-def index():
-    """Main route"""
-    return jsonify({
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    'error': 'Internal Server Error',
+    'message': 'An internal server error occurred',
+    'status_code': 500
+})
+
+_MISSING_QUESTION_BODY = orjson.dumps({
+    'error': 'Missing question',
+    'message': 'Please provide a question in JSON format: {"question": "your question"}',
+    'example': '{"question": "What departments does the ministry have?"}'
+})
+
+def _build_status_bodies():
+    """Serialize the bodies that report component state"""
+    global _index_template, _health_template, _health_etag, _demo_template, _no_ai_body
+    c = _components
+    # Before the first initialization nothing has failed yet; report that
+    # as pending rather than as missing components
+    initialized = _init_result is not None
+    
+    _index_template = json_template({
         'message': 'AI Document Management System',
         'status': 'running',
+        'initialized': initialized,
         'components_ready': components_ready,
         'available_endpoints': {
             'health': '/health',
@@ -73,127 +167,219 @@ def index():
             'ask_ai': '/demo-ask (POST)',
             'simple_login': '/simple-login',
             'components_test': '/test-components'
+        }
+    })
+
+    _health_template = json_template({
+        'status': 'healthy',
+        'initialized': initialized,
+        'components': {
+            'file_manager': c.file_manager is not None,
+            'knowledge_base': c.knowledge_base is not None,
+            'user_manager': c.user_manager is not None,
+            'ai_assistant': c.ai_assistant is not None,
+            'components_ready': components_ready
         },
-        'timestamp': datetime.now().isoformat()
+        'environment': dict(_ENV_SNAPSHOT, python_version=sys.version)
     })
+    # Weak ETag: only the timestamp differs between bodies with the same tag
+    _health_etag = hashlib.blake2b(_health_template, digest_size=8).hexdigest()
+
+    if initialized:
+        demo_status = 'ready' if c.ai_assistant else 'limited'
+        ai_available = c.ai_assistant is not None
+    else:
+        # Components are built by the first /demo-ask; until then the
+        # API key is the best predictor of whether AI will be available
+        demo_status = 'initializing'
+        ai_available = _ENV_SNAPSHOT['has_gemini_key']
+    _demo_template = json_template({
+        'message': 'Demo mode - AI Document Management System',
+        'status': demo_status,
+        'ai_available': ai_available,
+        'knowledge_base_ready': c.knowledge_base is not None,
+        'demo_query_endpoint': '/demo-ask',
+        'instructions': {
+            'how_to_ask': 'POST to /demo-ask with JSON: {"question": "your question"}',
+            'sample_questions': [
+                "What departments does the ministry have?",
+                "What are the contact details for HR?",
+                "How do I apply for vacation leave?",
+                "What are the working hours?"
+            ]
+        }
+    })
+
+    _no_ai_body = orjson.dumps({
+        'error': 'AI Assistant not available',
+        'message': 'AI components not properly initialized',
+        'available_components': {
+            'file_manager': c.file_manager is not None,
+            'knowledge_base': c.knowledge_base is not None,
+            'ai_assistant': c.ai_assistant is not None
+        }
+    })
+
+# Result of the first initialization; None until it has run
+_init_result = None
+_init_lock = threading.Lock()
+
+def safe_import_and_init():
+    """Initialize components once; repeated calls return the first result"""
+    global _init_result, components_ready
+    if _init_result is None:
+        with _init_lock:
+            if _init_result is None:
+                _init_result = _import_and_init()
+                components_ready = _init_result
+                _build_status_bodies()
+    return _init_result
+
+# Components are initialized on first use (see demo_ask) so a cold start can
+# answer /, /health and /demo without importing models or the Gemini SDK.
+# Long-running servers initialize eagerly from wsgi.py instead.
+components_ready = False
+_build_status_bodies()
+
+@app.route('/')
+def index():
+    """Main route"""
+    return timestamped_response(_index_template)
 
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
-    try:
-        return jsonify({
-            'status': 'healthy',
-            'components': {
-                'file_manager': file_manager is not None,
-                'knowledge_base': knowledge_base is not None,
-                'user_manager': user_manager is not None,
-                'ai_assistant': ai_assistant is not None,
-                'components_ready': components_ready
-            },
-            'environment': {
-                'python_version': sys.version,
-                'flask_env': os.environ.get('FLASK_ENV', 'not_set'),
-                'has_gemini_key': bool(os.environ.get('GEMINI_API_KEY')),
-                'vercel_env': os.environ.get('VERCEL_ENV', 'not_vercel')
-            },
-            'timestamp': datetime.now().isoformat()
-        }), 200
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'error': str(e),
-            'error_type': type(e).__name__,
-            'timestamp': datetime.now().isoformat()
-        }), 500
+    # Probes that revalidate get a bare 304 while component state is unchanged
+    if request.if_none_match.contains_weak(_health_etag):
+        response = Response(status=304)
+    else:
+        response = timestamped_response(_health_template)
+    response.set_etag(_health_etag, weak=True)
+    response.headers['Cache-Control'] = 'public, max-age=1'
+    return response
 
 @app.route('/demo')
 def demo_access():
     """Demo access without authentication"""
-    try:
-        return jsonify({
-            'message': 'Demo mode - AI Document Management System',
-            'status': 'ready' if ai_assistant else 'limited',
-            'ai_available': ai_assistant is not None,
-            'knowledge_base_ready': knowledge_base is not None,
-            'demo_query_endpoint': '/demo-ask',
-            'instructions': {
-                'how_to_ask': 'POST to /demo-ask with JSON: {"question": "your question"}',
-                'sample_questions': [
-                    "What departments does the ministry have?",
-                    "What are the contact details for HR?",
-                    "How do I apply for vacation leave?",
-                    "What are the working hours?"
-                ]
-            },
-            'timestamp': datetime.now().isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'error': 'Demo access failed',
-            'message': str(e)
-        }), 500
+    return timestamped_response(_demo_template)
+
+# LRU cache of AI answers keyed by normalized question text
+_ANSWER_CACHE_MAX = 512
+_answer_cache = OrderedDict()
+_answer_cache_lock = threading.Lock()
+
+def _normalize_question(question):
+    """Build a cache key that ignores case and surrounding/repeated whitespace"""
+    return ' '.join(str(question).lower().split())
+
+def _get_cached_answer(key):
+    """Return a cached answer and mark it as recently used, or None"""
+    with _answer_cache_lock:
+        answer = _answer_cache.get(key)
+        if answer is not None:
+            _answer_cache.move_to_end(key)
+        return answer
+
+def _store_cached_answer(key, answer):
+    """Cache an answer, evicting the least recently used entry when full"""
+    with _answer_cache_lock:
+        _answer_cache[key] = answer
+        _answer_cache.move_to_end(key)
+        if len(_answer_cache) > _ANSWER_CACHE_MAX:
+            _answer_cache.popitem(last=False)
+
+# Dummy user info for demo mode
+_DEMO_USER_INFO = {
+    'id': 'demo_user',
+    'username': 'demo',
+    'name': 'Demo User',
+    'role': 'admin'  # Give admin access for demo
+}
+
+# Gemini calls are retried once before falling back to the knowledge base
+_AI_ATTEMPTS = 2
+
+def _answer_question(c, question, cache_key):
+    """Ask the AI assistant, falling back to the knowledge base on failure"""
+    for _ in range(_AI_ATTEMPTS):
+        response = c.ai_assistant.try_generate_response(question, _DEMO_USER_INFO)
+        if response is not None:
+            # Only genuine AI answers are worth reusing
+            _store_cached_answer(cache_key, response)
+            return response
+    
+    kb_response = c.knowledge_base.search(question)
+    return f"Tapılan məlumatlar:\n\n{kb_response}"
+
+# In-flight AI calls, so concurrent identical questions wait for the
+# first caller's answer instead of each paying the full model latency
+_COALESCE_TIMEOUT = 60
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _coalesced(key, compute):
+    """Run compute() once for all concurrent callers sharing the same key"""
+    with _inflight_lock:
+        entry = _inflight.get(key)
+        is_leader = entry is None
+        if is_leader:
+            entry = _inflight[key] = (threading.Event(), [])
+    done, result = entry
+    
+    if is_leader:
+        try:
+            result.append(compute())
+        finally:
+            with _inflight_lock:
+                del _inflight[key]
+            done.set()
+        return result[0]
+    
+    # Followers reuse the leader's answer, or compute their own if it failed
+    done.wait(_COALESCE_TIMEOUT)
+    if result:
+        return result[0]
+    return compute()
 
 @app.route('/demo-ask', methods=['POST'])
 def demo_ask():
     """Demo AI assistant without authentication"""
     try:
-        if not ai_assistant:
-            return jsonify({
-                'error': 'AI Assistant not available',
-                'message': 'AI components not properly initialized',
-                'available_components': {
-                    'file_manager': file_manager is not None,
-                    'knowledge_base': knowledge_base is not None,
-                    'ai_assistant': ai_assistant is not None
-                }
-            }), 503
+        safe_import_and_init()
+        c = _components
+        if c.ai_assistant is None:
+            return Response(_no_ai_body, status=503, mimetype='application/json')
         
-        data = request.get_json()
-        if not data or 'question' not in data:
-            return jsonify({
-                'error': 'Missing question',
-                'message': 'Please provide a question in JSON format: {"question": "your question"}',
-                'example': '{"question": "What departments does the ministry have?"}'
-            }), 400
-        
-        question = data['question']
+        # Parse the raw body directly; it only ever carries a question field
+        try:
+            data = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            data = None
+        question = data.get('question') if isinstance(data, dict) else None
+        if not question:
+            return Response(_MISSING_QUESTION_BODY, status=400, mimetype='application/json')
         
-        # Create dummy user info for demo mode
-        demo_user_info = {
-            'id': 'demo_user',
-            'username': 'demo',
-            'name': 'Demo User',
-            'role': 'admin'  # Give admin access for demo
-        }
+        # Repeated questions are answered from the cache without calling the AI
+        cache_key = _normalize_question(question)
+        cached_answer = _get_cached_answer(cache_key)
+        if cached_answer is not None:
+            return jsonify({
+                'question': question,
+                'answer': cached_answer,
+                'timestamp': now_iso(),
+                'mode': 'demo',
+                'cached': True
+            })
         
-        # Use the AI assistant to answer
-        try:
-            response = ai_assistant.generate_enhanced_response(question, demo_user_info)
-            
-            # Check if we got the generic error message
-            if "texniki problem var" in response:
-                # Try the simpler method instead
-                response = ai_assistant.generate_response(question, demo_user_info)
-                
-            # If still getting error, try direct knowledge base search
-            if "texniki problem var" in response:
-                # Fallback to direct knowledge base search
-                kb_response = knowledge_base.search(question)
-                response = f"Tapılan məlumatlar:\n\n{kb_response}"
-                
-        except Exception as ai_error:
-            # If AI fails completely, use knowledge base directly
-            try:
-                kb_response = knowledge_base.search(question)
-                response = f"Məlumat bazasından tapılan nəticələr:\n\n{kb_response}"
-            except Exception as kb_error:
-                response = f"Xəta baş verdi: AI Error: {str(ai_error)}, KB Error: {str(kb_error)}"
+        # Concurrent requests for the same question share one AI call
+        response = _coalesced(cache_key, lambda: _answer_question(c, question, cache_key))
         
         return jsonify({
             'question': question,
             'answer': response,
-            'timestamp': datetime.now().isoformat(),
-            'mode': 'demo'
+            'timestamp': now_iso(),
+            'mode': 'demo',
+            'cached': False
         })
         
     except Exception as e:
@@ -201,222 +387,93 @@ def demo_ask():
             'error': 'AI query failed',
             'message': str(e),
             'question': data.get('question', 'unknown') if 'data' in locals() else 'unknown',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
+# Static HTML pages under static/, read and precompressed once at import
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+def _read_static_page(filename):
+    """Read an HTML page from the static directory"""
+    with open(os.path.join(_STATIC_DIR, filename), encoding='utf-8') as f:
+        return f.read()
+
+def _minify_html(html):
+    """Strip indentation, blank lines and whole-line comments from a page"""
+    # Line breaks are kept so inline scripts never depend on semicolon insertion
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    lines = (line.strip() for line in html.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def _precompress_page(html):
+    """Minify and encode an HTML page once and keep compressed copies alongside it"""
+    body = _minify_html(html).encode('utf-8')
+    variants = {'identity': body, 'gzip': gzip.compress(body, 9)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    return {
+        encoding: (data, hashlib.blake2b(data, digest_size=16).hexdigest())
+        for encoding, data in variants.items()
+    }
+
+def _serve_page(page):
+    """Return a precomputed page in the best encoding the client accepts"""
+    accept = request.accept_encodings
+    encoding = 'identity'
+    for candidate in ('br', 'gzip'):
+        if candidate in page and accept.quality(candidate):
+            encoding = candidate
+            break
+    body, etag = page[encoding]
+    response = Response(body, mimetype='text/html')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+_LOGIN_PAGE = _precompress_page(_read_static_page('login.html'))
+_AI_INTERFACE_PAGE = _precompress_page(_read_static_page('ai-interface.html'))
+
 @app.route('/simple-login')
 def simple_login():
     """Simple login form as HTML"""
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>AI Document Management - Login</title>
-        <style>
-            body { font-family: Arial, sans-serif; max-width: 400px; margin: 50px auto; padding: 20px; }
-            .form-group { margin: 10px 0; }
-            input[type="text"], input[type="password"] { width: 100%; padding: 8px; margin: 5px 0; }
-            button { background: #007bff; color: white; padding: 10px 20px; border: none; cursor: pointer; }
-            .demo-creds { background: #f8f9fa; padding: 15px; margin: 20px 0; border-radius: 5px; }
-        </style>
-    </head>
-    <body>
-        <h2>AI Document Management System</h2>
-        <form id="loginForm">
-            <div class="form-group">
-                <input type="text" id="username" placeholder="Username" required>
-            </div>
-            <div class="form-group">
-                <input type="password" id="password" placeholder="Password" required>
-            </div>
-            <button type="submit">Login</button>
-        </form>
-        
-        <div class="demo-creds">
-            <h4>Demo Credentials:</h4>
-            <p><strong>Admin:</strong> admin / admin123</p>
-            <p><strong>Minister:</strong> nazir / nazir123</p>
-            <p><strong>Analyst:</strong> analitik / data123</p>
-        </div>
-        
-        <script>
-            document.getElementById('loginForm').onsubmit = function(e) {
-                e.preventDefault();
-                const username = document.getElementById('username').value;
-                const password = document.getElementById('password').value;
-                
-                // Simple demo check
-                const users = {
-                    'admin': 'admin123',
-                    'nazir': 'nazir123',
-                    'analitik': 'data123'
-                };
-                
-                if (users[username] === password) {
-                    alert('Login successful! Redirecting to AI interface...');
-                    window.location.href = '/ai-interface';
-                } else {
-                    alert('Invalid credentials. Please use demo credentials.');
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
-    return html
+    return _serve_page(_LOGIN_PAGE)
 
 @app.route('/ai-interface')
 def ai_interface():
     """Simple AI interface for testing"""
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>AI Document Management - AI Assistant</title>
-        <style>
-            body { font-family: Arial, sans-serif; max-width: 800px; margin: 20px auto; padding: 20px; }
-            .chat-container { background: #f8f9fa; padding: 20px; border-radius: 10px; margin: 20px 0; max-height: 400px; overflow-y: auto; }
-            .question-form { margin: 20px 0; }
-            textarea { width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 5px; resize: vertical; }
-            button { background: #28a745; color: white; padding: 10px 20px; border: none; border-radius: 5px; cursor: pointer; margin: 10px 5px 0 0; }
-            button:hover { background: #218838; }
-            .loading { color: #007bff; font-style: italic; }
-            .error { color: #dc3545; background: #f8d7da; padding: 10px; border-radius: 5px; margin: 10px 0; }
-            .answer { background: #d4edda; padding: 15px; border-radius: 5px; margin: 10px 0; border-left: 4px solid #28a745; }
-            .question { background: #e2e3e5; padding: 10px; border-radius: 5px; margin: 10px 0; border-left: 4px solid #6c757d; }
-            .sample-questions { background: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0; }
-            .sample-btn { background: #ffc107; color: #212529; padding: 5px 10px; border: none; border-radius: 3px; cursor: pointer; margin: 5px; font-size: 12px; }
-        </style>
-    </head>
-    <body>
-        <h1>🤖 AI Document Management Assistant</h1>
-        <p>Ask questions about the ministry, departments, procedures, and documents.</p>
-        
-        <div class="sample-questions">
-            <h3>📝 Sample Questions (Click to try):</h3>
-            <button class="sample-btn" onclick="askQuestion('What departments does the ministry have?')">Ministry Departments</button>
-            <button class="sample-btn" onclick="askQuestion('What are the contact details for HR?')">HR Contact Info</button>
-            <button class="sample-btn" onclick="askQuestion('How do I apply for vacation leave?')">Vacation Leave</button>
-            <button class="sample-btn" onclick="askQuestion('What are the working hours?')">Working Hours</button>
-            <button class="sample-btn" onclick="askQuestion('How much is the daily allowance for business travel?')">Travel Allowance</button>
-        </div>
-        
-        <div class="question-form">
-            <textarea id="questionInput" placeholder="Ask your question here..." rows="3"></textarea><br>
-            <button onclick="submitQuestion()">Ask AI</button>
-            <button onclick="clearChat()">Clear Chat</button>
-        </div>
-        
-        <div id="chatContainer" class="chat-container">
-            <p>💡 Welcome! Ask me anything about the ministry, departments, procedures, or documents.</p>
-        </div>
-        
-        <script>
-            function askQuestion(question) {
-                document.getElementById('questionInput').value = question;
-                submitQuestion();
-            }
-            
-            function submitQuestion() {
-                const question = document.getElementById('questionInput').value.trim();
-                if (!question) {
-                    alert('Please enter a question');
-                    return;
-                }
-                
-                const chatContainer = document.getElementById('chatContainer');
-                
-                // Add question to chat
-                chatContainer.innerHTML += '<div class="question"><strong>You:</strong> ' + question + '</div>';
-                
-                // Add loading indicator
-                chatContainer.innerHTML += '<div class="loading" id="loading">🤖 AI is thinking...</div>';
-                chatContainer.scrollTop = chatContainer.scrollHeight;
-                
-                // Make API call
-                fetch('/demo-ask', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({question: question})
-                })
-                .then(response => response.json())
-                .then(data => {
-                    // Remove loading indicator
-                    document.getElementById('loading').remove();
-                    
-                    if (data.error) {
-                        chatContainer.innerHTML += '<div class="error"><strong>Error:</strong> ' + data.error + '<br><strong>Message:</strong> ' + data.message + '</div>';
-                    } else {
-                        chatContainer.innerHTML += '<div class="answer"><strong>🤖 AI Assistant:</strong><br>' + data.answer + '</div>';
-                    }
-                    chatContainer.scrollTop = chatContainer.scrollHeight;
-                })
-                .catch(error => {
-                    // Remove loading indicator
-                    const loading = document.getElementById('loading');
-                    if (loading) loading.remove();
-                    
-                    chatContainer.innerHTML += '<div class="error"><strong>Network Error:</strong> Could not connect to AI service. Please try again.</div>';
-                    chatContainer.scrollTop = chatContainer.scrollHeight;
-                });
-                
-                // Clear input
-                document.getElementById('questionInput').value = '';
-            }
-            
-            function clearChat() {
-                document.getElementById('chatContainer').innerHTML = '<p>💡 Welcome! Ask me anything about the ministry, departments, procedures, or documents.</p>';
-            }
-            
-            // Allow Enter key to submit
-            document.getElementById('questionInput').addEventListener('keypress', function(e) {
-                if (e.key === 'Enter' && !e.shiftKey) {
-                    e.preventDefault();
-                    submitQuestion();
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-    return html
+    return _serve_page(_AI_INTERFACE_PAGE)
 
 @app.route('/test-components')
 def test_components():
     """Test individual components"""
     results = {}
+    # This endpoint exists to exercise the components, so build them if needed
+    safe_import_and_init()
+    c = _components
     
     try:
-        results['file_manager'] = 'working' if file_manager else 'not_initialized'
-        results['knowledge_base'] = 'working' if knowledge_base else 'not_initialized'
-        results['user_manager'] = 'working' if user_manager else 'not_initialized'
-        results['ai_assistant'] = 'working' if ai_assistant else 'not_initialized'
+        results['file_manager'] = 'working' if c.file_manager else 'not_initialized'
+        results['knowledge_base'] = 'working' if c.knowledge_base else 'not_initialized'
+        results['user_manager'] = 'working' if c.user_manager else 'not_initialized'
+        results['ai_assistant'] = 'working' if c.ai_assistant else 'not_initialized'
     except Exception as e:
         results['error'] = str(e)
     
     return jsonify({
         'component_tests': results,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     })
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'error': 'Not Found',
-        'message': 'The requested resource was not found',
-        'available_endpoints': ['/', '/health', '/demo', '/demo-ask', '/simple-login', '/test-components'],
-        'status_code': 404
-    }), 404
+    return Response(_NOT_FOUND_BODY, status=404, mimetype='application/json')
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'error': 'Internal Server Error',
-        'message': 'An internal server error occurred',
-        'status_code': 500
-    }), 500
+    return Response(_INTERNAL_ERROR_BODY, status=500, mimetype='application/json')
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
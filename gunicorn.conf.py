@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for production deployments
+
+    gunicorn -c gunicorn.conf.py
+"""
+import gc
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# gevent workers so requests waiting on the Gemini API don't block each other
+worker_class = 'gevent'
+worker_connections = 1000
+workers = multiprocessing.cpu_count() * 2 + 1
+
+# Load the app (and its knowledge base) once in the master process;
+# forked workers share those pages copy-on-write
+preload_app = True
+
+
+def pre_fork(server, worker):
+    """Move preloaded objects out of GC tracking before forking a worker"""
+    # Collections in the workers would otherwise touch every long-lived
+    # object's GC header and dirty the shared pages
+    gc.freeze()
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime
+
+import orjson
+from flask import Response
+
+# Cached timestamp string, reformatted at most once per second
+_ts_cache = (0, '')
+
+def now_iso():
+    """Return the current local time as an ISO string with second granularity"""
+    global _ts_cache
+    t = int(time.time())
+    cached_t, cached_iso = _ts_cache
+    if cached_t != t:
+        cached_iso = datetime.fromtimestamp(t).isoformat()
+        _ts_cache = (t, cached_iso)
+    return cached_iso
+
+# Constant JSON bodies are serialized ahead of time. Only the timestamp
+# placeholder is patched per request.
+TIMESTAMP_PLACEHOLDER = b'__TS__'
+
+def json_template(payload):
+    """Serialize a payload once, leaving a placeholder for the timestamp"""
+    payload = dict(payload, timestamp=TIMESTAMP_PLACEHOLDER.decode())
+    return orjson.dumps(payload)
+
+def fill_timestamp(template):
+    """Patch the current timestamp into a serialized template"""
+    return template.replace(TIMESTAMP_PLACEHOLDER, now_iso().encode())
+
+def timestamped_response(template, status=200):
+    """Fill in the current timestamp and wrap a JSON template in a Response"""
+    return Response(fill_timestamp(template), status=status, mimetype='application/json')
@@ -5,6 +5,7 @@ import hashlib
 from datetime import datetime
 from file_manager import FileManager
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -94,20 +95,27 @@ Hörmətlə,
 [Ad Soyad]"""
             }
         }
+        self.static_index = self.build_static_index()
 
-    def search_static_data(self, query: str) -> str:
-        """Search through static knowledge base"""
-        query_lower = query.lower()
-        relevant_info = []
-
+    def build_static_index(self) -> list:
+        """Precompute lower-cased search text and output line for each static entry"""
+        index = []
         for category, items in self.static_data.items():
             for key, value in items.items():
-                if any(term in key.lower() or term in str(value).lower()
-                       for term in query_lower.split()):
-                    if isinstance(value, dict):
-                        relevant_info.append(f"{key}: {json.dumps(value, ensure_ascii=False)}")
-                    else:
-                        relevant_info.append(f"{key}: {value}")
+                if isinstance(value, dict):
+                    line = f"{key}: {json.dumps(value, ensure_ascii=False)}"
+                else:
+                    line = f"{key}: {value}"
+                index.append((key.lower(), str(value).lower(), line))
+        return index
+
+    def search_static_data(self, query: str) -> str:
+        """Search through static knowledge base"""
+        terms = query.lower().split()
+        relevant_info = [
+            line for key_lower, value_lower, line in self.static_index
+            if any(term in key_lower or term in value_lower for term in terms)
+        ]
 
         return "\n".join(relevant_info) if relevant_info else ""
 
@@ -279,8 +287,10 @@ class EnhancedAIAssistant:
 
     def __init__(self, knowledge_base: EnhancedKnowledgeBase, gemini_api_key: str):
         self.kb = knowledge_base
-        # Configure Gemini API
-        genai.configure(api_key=gemini_api_key)
+        # Configure Gemini API. The REST transport goes through the socket
+        # module, so gevent workers can yield while waiting on the API
+        # instead of blocking inside gRPC's native event loop.
+        genai.configure(api_key=gemini_api_key, transport='rest')
         # Initialize Gemini model
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
         self.conversation_history = {}  # Store conversation context per user
@@ -363,8 +373,11 @@ class EnhancedAIAssistant:
         match = re.search(pattern, message, re.IGNORECASE)
         return match.group(1) if match else ""
 
-    def generate_enhanced_response(self, user_message: str, user_info: dict) -> str:
-        """Enhanced response generation with better context and document handling"""
+    def try_generate_response(self, user_message: str, user_info: dict) -> Optional[str]:
+        """Enhanced response generation with better context and document handling.
+
+        Returns None instead of an apology message when generation fails.
+        """
         try:
             user_id = str(user_info['id'])
 
@@ -441,7 +454,14 @@ CAVAB (2-6 cümlə):"""
 
         except Exception as e:
             logger.error(f"AI Error: {e}")
+            return None
+
+    def generate_enhanced_response(self, user_message: str, user_info: dict) -> str:
+        """Generate a response, falling back to a generic apology on failure"""
+        response = self.try_generate_response(user_message, user_info)
+        if response is None:
             return "Üzr istəyirəm, hazırda texniki problem var. Zəhmət olmasa sonra yenidən cəhd edin."
+        return response
 
     def generate_response(self, user_message: str, user_info: dict) -> str:
         """Wrapper method for backward compatibility"""
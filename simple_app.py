@@ -1,31 +1,69 @@
-from flask import Flask, jsonify
-from datetime import datetime
+from flask import Flask, Response
 import os
 
+from json_responses import fill_timestamp, json_template
+
 # Create a simple Flask app for testing
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'fallback-secret-key')
 
+# Serialized once; only the timestamp placeholder is patched per request
+_HELLO_TEMPLATE = json_template({
+    'message': 'Hello from Vercel!',
+    'status': 'success'
+})
+
+_HEALTH_TEMPLATE = json_template({
+    'status': 'healthy',
+    'app': 'AI Document Management System',
+    'environment': os.environ.get('VERCEL_ENV', 'unknown')
+})
+
+_TEST_PAGE = b'<h1>Flask App is Working on Vercel!</h1><p>Your deployment is successful.</p>'
+
+# Path -> (content type, body template)
+_CANNED_ROUTES = {
+    '/': ('application/json', _HELLO_TEMPLATE),
+    '/health': ('application/json', _HEALTH_TEMPLATE),
+    '/test': ('text/html; charset=utf-8', _TEST_PAGE)
+}
+
+def _render(path):
+    content_type, template = _CANNED_ROUTES[path]
+    return content_type, fill_timestamp(template)
+
+class FastPaths:
+    """Answer GET requests for the canned routes without entering Flask"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO')
+        if path in _CANNED_ROUTES and environ.get('REQUEST_METHOD') == 'GET':
+            content_type, body = _render(path)
+            start_response('200 OK', [('Content-Type', content_type), ('Content-Length', str(len(body)))])
+            return [body]
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = FastPaths(app.wsgi_app)
+
+# The routes stay registered for HEAD requests and anything else that
+# reaches Flask
 @app.route('/')
 def hello():
-    return jsonify({
-        'message': 'Hello from Vercel!',
-        'status': 'success',
-        'timestamp': datetime.now().isoformat()
-    })
+    content_type, body = _render('/')
+    return Response(body, content_type=content_type)
 
 @app.route('/health')
 def health():
-    return jsonify({
-        'status': 'healthy',
-        'app': 'AI Document Management System',
-        'environment': os.environ.get('VERCEL_ENV', 'unknown'),
-        'timestamp': datetime.now().isoformat()
-    })
+    content_type, body = _render('/health')
+    return Response(body, content_type=content_type)
 
 @app.route('/test')
 def test():
-    return '<h1>Flask App is Working on Vercel!</h1><p>Your deployment is successful.</p>'
+    content_type, body = _render('/test')
+    return Response(body, content_type=content_type)
 
 if __name__ == '__main__':
     app.run(debug=True)
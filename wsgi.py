@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+WSGI entrypoint for running app_minimal under gunicorn with gevent workers
+
+    gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:app
+"""
+# Monkey-patching must happen before anything imports socket/ssl,
+# otherwise the Gemini HTTP calls would still block the whole worker
+from gevent import monkey
+monkey.patch_all()
+
+from app_minimal import app, safe_import_and_init  # noqa: E402
+
+# Long-running workers initialize up front (in the gunicorn master when the
+# app is preloaded) rather than on the first /demo-ask request
+safe_import_and_init()